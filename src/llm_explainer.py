@@ -1,38 +1,69 @@
 import anthropic
-import json
-from .models import RuleResult, LLMExplanation, Confidence
+import asyncio
+import orjson
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+from anthropic.types.messages.batch_create_params import Request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from .models import RuleResult, LLMExplanation, Confidence, Decision
+from .rule_engine import RuleEngine
+
+# Transient API failures worth retrying; other errors (bad request, auth) are not
+RETRYABLE_ERRORS = (
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
+class _RateBucket:
+    """Leaky bucket allowing max_rate units per time_period seconds
+
+    State lives on time.monotonic() rather than an event loop, so the budget
+    carries over between generate_batch calls (each runs in its own loop).
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self._leak_rate = max_rate / time_period
+        self._level = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.max_rate)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = max(0.0, self._level - (now - self._last) * self._leak_rate)
+                self._last = now
+                if self._level + amount <= self.max_rate:
+                    self._level += amount
+                    return
+                wait = (self._level + amount - self.max_rate) / self._leak_rate
+            await asyncio.sleep(wait)
 
 class LLMExplainer:
-    def __init__(self, api_key: str = None):
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = "claude-sonnet-4-20250514"
+    # JSON object or array inside an optional ```json fenced block
+    # Message Batches API requirement for custom_id, which carries the transaction_id
+    BATCH_CUSTOM_ID = re.compile(r'[a-zA-Z0-9_-]{1,64}')
+    CODE_FENCE = re.compile(r'```(?:json)?\s*([\[{].*[\]}])\s*```', re.DOTALL)
+    # Record fields that identify a transaction but never explain a decision
+    IDENTITY_FIELDS = frozenset({'transaction_id', 'timestamp'})
 
-    def generate_explanation(
-        self, 
-        record: dict, 
-        rule_result: RuleResult
-    ) -> LLMExplanation:
-        """Generate human-readable explanation for a decision"""
-        
-        prompt = f"""You are a fraud analyst assistant. Your job is to explain 
+    # Static prompt sections; only the transaction and rule details are interpolated per call
+    PROMPT_PREFIX = """You are a fraud analyst assistant. Your job is to explain 
 fraud detection decisions to human reviewers in clear, professional language.
 
 IMPORTANT: You do NOT make decisions. The decision has already been made by 
 deterministic rules. You only EXPLAIN the decision.
 
-## Transaction Data
-```json
-{json.dumps(record, indent=2, default=str)}
-```
-
-## Rule Engine Decision
-- Rule Matched: {rule_result.matched_rule_name} ({rule_result.matched_rule_id})
-- Risk Score: {rule_result.risk_score}/100
-- Decision: {rule_result.decision.value}
-- Rule Reason: {rule_result.rule_reason}
-
-## Your Task
-1. Explain this decision in 2-3 sentences a non-technical reviewer can understand
+"""
+    TASK_STEPS = """1. Explain this decision in 2-3 sentences a non-technical reviewer can understand
 2. Assess your confidence in the EXPLANATION (not the decision):
    - HIGH: The rule clearly applies, explanation is straightforward
    - MEDIUM: Some ambiguity in the data or edge case
@@ -40,36 +71,167 @@ deterministic rules. You only EXPLAIN the decision.
 3. If confidence is MEDIUM or LOW, suggest 1-3 clarifying questions 
    that a human reviewer should investigate
 
-Respond in this exact JSON format:
-{{
+"""
+    RESPONSE_SCHEMA = """{
     "human_readable_explanation": "string",
     "confidence": "HIGH" | "MEDIUM" | "LOW",
     "needs_human_review": boolean,
     "clarifying_questions": ["string"] or [],
     "additional_context": "string or null"
-}}"""
+}"""
+    PROMPT_SUFFIX = "## Your Task\n" + TASK_STEPS + "Respond in this exact JSON format:\n" + RESPONSE_SCHEMA
+    GROUP_TASK = "## Your Task\nFor EACH transaction:\n" + TASK_STEPS
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
+    def __init__(
+        self,
+        api_key: str = None,
+        max_concurrency: int = 10,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        cache_size: int = 4096,
+        max_group_size: int = 20,
+        requests_per_minute: int = 40,
+        tokens_per_minute: int = 16000,
+        template_only_rules: Optional[set[str]] = None,
+        rule_engine: Optional[RuleEngine] = None
+    ):
+        self.api_key = api_key
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.model = "claude-sonnet-4-20250514"
+        self.max_concurrency = max_concurrency
+        if max_retries < 0:
+            raise ValueError(f"max_retries must be >= 0, got {max_retries}")
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.cache_size = cache_size
+        self.max_group_size = max_group_size
+        # Proactive throttling so concurrent batches stay under the API rate limits
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._rpm_bucket = _RateBucket(requests_per_minute, 60)
+        self._tpm_bucket = _RateBucket(tokens_per_minute, 60)
+        self._cache: OrderedDict[tuple, LLMExplanation] = OrderedDict()
+        # Rule IDs explained by a static template instead of the LLM
+        self.template_only_rules: set[str] = set(template_only_rules or ())
+        # Fields referenced by each rule's conditions, so prompts carry only what drove the match
+        self._rule_fields: dict[str, list[str]] = {}
+        if rule_engine is not None:
+            for rule in rule_engine.rules:
+                fields = [c['field'] for c in rule.get('conditions') or []]
+                self._rule_fields[rule['id']] = list(dict.fromkeys(fields))
+
+    def _is_template_only(self, rule_result: RuleResult) -> bool:
+        """Allowed and default decisions (plus configured rules) need no LLM explanation"""
+        return (
+            rule_result.decision == Decision.ALLOW
+            or rule_result.matched_rule_id == 'DEFAULT'
+            or rule_result.matched_rule_id in self.template_only_rules
+        )
+
+    def _template_explanation(self, rule_result: RuleResult) -> LLMExplanation:
+        return LLMExplanation(
+            human_readable_explanation=(
+                f"Transaction matched {rule_result.matched_rule_name}: {rule_result.rule_reason}"
+            ),
+            confidence=Confidence.HIGH,
+            needs_human_review=False,
+            clarifying_questions=[],
+            additional_context=None
+        )
+
+    def _cache_key(self, record: dict, rule_result: RuleResult) -> tuple:
+        """Key explanations on exactly what the prompt shows the model
+
+        The rule decision and the rendered record fields are the only per-call
+        prompt content, so two transactions share an explanation only when their
+        prompts are identical. Identity fields (transaction_id, timestamp) are not
+        rendered and so never split the cache.
+        """
+        return (
+            self._rule_decision(rule_result),
+            self._format_fields(record, self._relevant_fields(rule_result)),
+        )
+
+    def _cache_get(self, key: tuple) -> Optional[LLMExplanation]:
+        explanation = self._cache.get(key)
+        if explanation is None:
+            return None
+        self._cache.move_to_end(key)
+        return explanation.model_copy(deep=True)
+
+    def _cache_put(self, key: tuple, explanation: LLMExplanation) -> None:
+        self._cache[key] = explanation
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _rule_decision(self, rule_result: RuleResult) -> str:
+        return (
+            f"- Rule Matched: {rule_result.matched_rule_name} ({rule_result.matched_rule_id})\n"
+            f"- Risk Score: {rule_result.risk_score}/100\n"
+            f"- Decision: {rule_result.decision.value}\n"
+            f"- Rule Reason: {rule_result.rule_reason}\n"
+        )
+
+    def _relevant_fields(self, rule_result: RuleResult) -> list[str]:
+        """Fields referenced by the matched rule's conditions (empty when unknown)"""
+        return self._rule_fields.get(rule_result.matched_rule_id, [])
+
+    def _format_fields(self, record: dict, fields: list[str]) -> str:
+        """Render record fields as compact `key: value` lines
+
+        Without a rule-derived field list, every non-identity field is included.
+        """
+        if not fields:
+            fields = [k for k in record if k not in self.IDENTITY_FIELDS]
+        return "\n".join(f"- {field}: {record.get(field)}" for field in fields)
+
+    def _build_prompt(self, record: dict, rule_result: RuleResult) -> str:
+        """Build the explanation prompt for a single record"""
+        tx_fields = self._format_fields(record, self._relevant_fields(rule_result))
+        body = (
+            f"## Transaction Data\n{tx_fields}\n\n"
+            f"## Rule Engine Decision\n{self._rule_decision(rule_result)}\n"
+        )
+        return self.PROMPT_PREFIX + body + self.PROMPT_SUFFIX
+
+    def _build_group_prompt(self, records: list[dict], rule_result: RuleResult) -> str:
+        """Build one prompt explaining several records that matched the same rule"""
+        fields = self._relevant_fields(rule_result)
+        transactions = "\n\n".join(
+            f"### Transaction {i}\n{self._format_fields(record, fields)}"
+            for i, record in enumerate(records, 1)
+        )
+        body = (
+            f"Explain each of the following {len(records)} transactions that matched rule "
+            f"{rule_result.matched_rule_id}.\n\n"
+            f"## Rule Engine Decision (same for every transaction)\n{self._rule_decision(rule_result)}\n"
+            f"## Transactions\n{transactions}\n\n"
+        )
+        response_format = (
+            f"Respond with a JSON array of exactly {len(records)} objects, in the same order as the \n"
+            "transactions, each in this exact format:\n"
+        )
+        return (
+            self.PROMPT_PREFIX + body + self.GROUP_TASK + response_format + self.RESPONSE_SCHEMA
         )
-        
-        # Parse structured output
-        response_text = response.content[0].text
-        
+
+    def _load_json(self, response_text: str) -> Any:
         # Handle potential markdown code blocks
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
-        
-        parsed = json.loads(response_text.strip())
-        
+        fenced = self.CODE_FENCE.search(response_text)
+        if fenced:
+            response_text = fenced.group(1)
+        return orjson.loads(response_text.strip())
+
+    def _parse_response(self, response_text: str) -> LLMExplanation:
+        """Parse the model's JSON reply into an LLMExplanation"""
+        return self._to_explanation(self._load_json(response_text))
+
+    def _to_explanation(self, parsed: dict) -> LLMExplanation:
         # Apply confidence threshold for human review
         confidence = Confidence(parsed['confidence'])
         needs_review = confidence in [Confidence.LOW, Confidence.MEDIUM]
-        
+
         return LLMExplanation(
             human_readable_explanation=parsed['human_readable_explanation'],
             confidence=confidence,
@@ -78,13 +240,223 @@ Respond in this exact JSON format:
             additional_context=parsed.get('additional_context')
         )
 
+    def generate_explanation(
+        self,
+        record: dict,
+        rule_result: RuleResult
+    ) -> LLMExplanation:
+        """Generate human-readable explanation for a decision"""
+        if self._is_template_only(rule_result):
+            return self._template_explanation(rule_result)
+
+        key = self._cache_key(record, rule_result)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=500,
+            messages=[{"role": "user", "content": self._build_prompt(record, rule_result)}]
+        )
+        explanation = self._parse_response(response.content[0].text)
+        self._cache_put(key, explanation)
+        return explanation
+
+    async def _generate_one(
+        self,
+        aclient: anthropic.AsyncAnthropic,
+        semaphore: asyncio.Semaphore,
+        record: dict,
+        rule_result: RuleResult
+    ) -> LLMExplanation:
+        """Generate one explanation, throttled to the rate limits and retried with backoff"""
+        if self._is_template_only(rule_result):
+            return self._template_explanation(rule_result)
+
+        key = self._cache_key(record, rule_result)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_prompt(record, rule_result)
+        # Rough input-token estimate (~4 characters per token), capped at the bucket size
+        est_tokens = min(len(prompt) // 4, self.tokens_per_minute)
+        # max_retries counts retries after the first attempt, as in the Anthropic SDK
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    await self._rpm_bucket.acquire()
+                    await self._tpm_bucket.acquire(est_tokens)
+                    response = await aclient.messages.create(
+                        model=self.model,
+                        max_tokens=500,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                explanation = self._parse_response(response.content[0].text)
+                self._cache_put(key, explanation)
+                return explanation
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                # Jitter keeps throttled requests from retrying in lockstep
+                delay = self.retry_base_delay * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def agenerate_batch(
+        self,
+        records: list[dict],
+        rule_results: list[RuleResult]
+    ) -> list[LLMExplanation]:
+        """Generate explanations concurrently, at most max_concurrency requests in flight"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Retries are handled in _generate_one, so disable the SDK's own retry loop
+        async with anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0) as aclient:
+            # Records sharing a cache key are explained by a single request
+            tasks: dict[tuple, asyncio.Task] = {}
+            keys = []
+            for record, result in zip(records, rule_results):
+                key = self._cache_key(record, result)
+                keys.append(key)
+                if key not in tasks:
+                    tasks[key] = asyncio.ensure_future(
+                        self._generate_one(aclient, semaphore, record, result)
+                    )
+            await asyncio.gather(*tasks.values())
+            return [tasks[key].result().model_copy(deep=True) for key in keys]
+
     def generate_batch(
-        self, 
-        records: list[dict], 
+        self,
+        records: list[dict],
         rule_results: list[RuleResult]
     ) -> list[LLMExplanation]:
         """Generate explanations for multiple records"""
-        return [
-            self.generate_explanation(record, result)
+        coro = self.agenerate_batch(records, rule_results)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Already inside an event loop (e.g. Jupyter): run on a separate thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
+
+    def generate_batch_async_job(
+        self,
+        records: list[dict],
+        rule_results: list[RuleResult]
+    ) -> str:
+        """Submit explanations to the Message Batches API and return the batch ID
+
+        Intended for large offline jobs (dashboard/audit backfills): batches are
+        billed at a discount and processed asynchronously. Results are keyed by
+        transaction_id, so IDs must be unique within a batch and valid custom_ids
+        (1-64 letters, digits, '_' or '-'); ValueError is raised before submitting
+        otherwise.
+
+        Template-only decisions (ALLOW, DEFAULT, template_only_rules) are not
+        submitted, so poll_batch results leave them out; callers merge them back
+        in with generate_explanation, which answers them without an API call.
+        Raises ValueError if every record is template-only.
+        """
+        requests = [
+            Request(
+                custom_id=str(result.transaction_id),
+                params=MessageCreateParamsNonStreaming(
+                    model=self.model,
+                    max_tokens=500,
+                    messages=[{"role": "user", "content": self._build_prompt(record, result)}]
+                )
+            )
             for record, result in zip(records, rule_results)
-        ]
\ No newline at end of file
+            if not self._is_template_only(result)
+        ]
+        if not requests:
+            raise ValueError("No records need an LLM explanation; all decisions are template-only")
+        # One bad custom_id makes the API reject the whole batch, so check them all up front
+        invalid = [r['custom_id'] for r in requests if not self.BATCH_CUSTOM_ID.fullmatch(r['custom_id'])]
+        if invalid:
+            raise ValueError(f"transaction_ids are not valid batch custom_ids: {invalid[:10]}")
+        counts = Counter(r['custom_id'] for r in requests)
+        duplicates = [custom_id for custom_id, count in counts.items() if count > 1]
+        if duplicates:
+            raise ValueError(f"Duplicate transaction_ids in batch: {duplicates[:10]}")
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    def poll_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0
+    ) -> dict[str, LLMExplanation]:
+        """Wait for a submitted batch to finish and return explanations by transaction_id
+
+        Requests that errored or expired, and replies that are not a valid
+        explanation, are left out of the result.
+        """
+        while self.client.messages.batches.retrieve(batch_id).processing_status != "ended":
+            time.sleep(poll_interval)
+
+        explanations = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                continue
+            try:
+                explanations[entry.custom_id] = self._parse_response(
+                    entry.result.message.content[0].text
+                )
+            except (KeyError, IndexError, TypeError, ValueError):
+                # Malformed reply (bad JSON, missing keys, unknown confidence): skip only this entry
+                continue
+        return explanations
+
+    def generate_explanation_grouped(
+        self,
+        records: list[dict],
+        rule_results: list[RuleResult]
+    ) -> list[LLMExplanation]:
+        """Generate explanations with one request per matched rule instead of per record
+
+        Uncached records are grouped by matched_rule_id and each group (split
+        into chunks of at most max_group_size) is explained by a single prompt
+        that returns a JSON array in transaction order. Groups of one use
+        generate_explanation.
+        """
+        explanations: list[Optional[LLMExplanation]] = [None] * len(records)
+        groups: dict[str, list[int]] = {}
+        for i, (record, result) in enumerate(zip(records, rule_results)):
+            if self._is_template_only(result):
+                explanations[i] = self._template_explanation(result)
+                continue
+            cached = self._cache_get(self._cache_key(record, result))
+            if cached is not None:
+                explanations[i] = cached
+            else:
+                groups.setdefault(result.matched_rule_id, []).append(i)
+
+        for positions in groups.values():
+            for start in range(0, len(positions), self.max_group_size):
+                chunk = positions[start:start + self.max_group_size]
+                if len(chunk) == 1:
+                    i = chunk[0]
+                    explanations[i] = self.generate_explanation(records[i], rule_results[i])
+                    continue
+
+                prompt = self._build_group_prompt([records[i] for i in chunk], rule_results[chunk[0]])
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=500 * len(chunk),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                parsed = self._load_json(response.content[0].text)
+                if not isinstance(parsed, list) or len(parsed) != len(chunk):
+                    raise ValueError(
+                        f"Expected a JSON array of {len(chunk)} explanations for rule "
+                        f"{rule_results[chunk[0]].matched_rule_id}"
+                    )
+
+                for i, item in zip(chunk, parsed):
+                    explanation = self._to_explanation(item)
+                    self._cache_put(self._cache_key(records[i], rule_results[i]), explanation)
+                    explanations[i] = explanation.model_copy(deep=True)
+
+        return explanations
@@ -35,9 +35,30 @@ if 'new_rule' not in st.session_state:
 if 'conditions' not in st.session_state:
     st.session_state.conditions = []
 
-# Initialize managers
-config_mgr = ConfigManager()
-data_validator = DataValidator()
+# Initialize managers (shared across reruns and sessions)
+@st.cache_resource
+def get_config_mgr() -> ConfigManager:
+    return ConfigManager()
+
+
+@st.cache_resource
+def get_data_validator() -> DataValidator:
+    return DataValidator()
+
+
+@st.cache_data(ttl=None, show_spinner=False)
+def _cached_load_rules(version: str, mtime_ns: int) -> Dict[str, Any]:
+    """Load rules once per version of the rules file (mtime_ns is the cache key)"""
+    return get_config_mgr().load_rules(version)
+
+
+@st.cache_data(ttl=30)
+def get_field_info() -> Dict[str, Dict[str, Any]]:
+    return get_data_validator().get_field_info()
+
+
+config_mgr = get_config_mgr()
+data_validator = get_data_validator()
 
 # Sidebar
 with st.sidebar:
@@ -49,6 +70,18 @@ with st.sidebar:
     st.page_link("pages/2_🧪_Test_Transactions.py", label="🧪 Test Transactions")
     st.page_link("pages/3_📜_Audit_Log.py", label="📜 Audit Log")
 
+    st.markdown("---")
+    st.markdown("### Rules File")
+    yaml_path = config_mgr.get_yaml_path("v1")
+    if yaml_path.exists() and st.button("📥 Import YAML", help=f"Replace the rule store with {yaml_path.name}"):
+        config_mgr.import_yaml("v1")
+        _cached_load_rules.clear()
+        st.success("Rules imported from YAML")
+    if config_mgr.yaml_has_unimported_edits("v1"):
+        st.warning(f"{yaml_path.name} was edited after the app last saved rules. Import it before making changes here.")
+    if st.button("📤 Export YAML", help=f"Write the current rules to {config_mgr.get_export_path('v1').name}"):
+        st.success(f"Rules exported to {config_mgr.export_yaml('v1')}")
+
     st.markdown("---")
     st.markdown(f"**Current Step:** {st.session_state.rule_step}/4")
 
@@ -79,7 +112,7 @@ if st.session_state.rule_step == 1:
     with col1:
         # Generate next rule ID
         try:
-            config = config_mgr.load_rules()
+            config = _cached_load_rules("v1", config_mgr.get_rules_path("v1").stat().st_mtime_ns)
             next_id = config_mgr.get_next_rule_id(config)
         except FileNotFoundError:
             next_id = "RULE_001"
@@ -121,7 +154,7 @@ elif st.session_state.rule_step == 2:
     st.markdown("Define what transaction attributes to check.")
 
     # Get available fields
-    field_info = data_validator.get_field_info()
+    field_info = get_field_info()
     field_names = list(field_info.keys())
 
     # Display existing conditions
@@ -367,6 +400,8 @@ elif st.session_state.rule_step == 4:
         if st.button("💾 Save Rule", type="primary", disabled=bool(errors)):
             try:
                 config_mgr.add_rule(rule_dict)
+                # Drop rules cached under the previous file version
+                _cached_load_rules.clear()
                 st.success(f"✅ Rule '{rule_dict['name']}' saved successfully!")
                 st.balloons()
 
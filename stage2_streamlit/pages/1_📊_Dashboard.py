@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 from pathlib import Path
+from typing import Dict, Any
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -14,6 +15,18 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource
+def get_config_mgr() -> ConfigManager:
+    return ConfigManager()
+
+
+@st.cache_data(ttl=None, show_spinner=False)
+def _cached_load_rules(version: str, mtime_ns: int) -> Dict[str, Any]:
+    """Load rules once per version of the rules file (mtime_ns is the cache key)"""
+    return get_config_mgr().load_rules(version)
+
+
 # Sidebar
 with st.sidebar:
     st.title("📊 Dashboard")
@@ -40,8 +53,8 @@ st.markdown("""
 
 # Show current rules as table for now
 try:
-    config_mgr = ConfigManager()
-    config = config_mgr.load_rules()
+    config_mgr = get_config_mgr()
+    config = _cached_load_rules("v1", config_mgr.get_rules_path("v1").stat().st_mtime_ns)
     rules = config.get('rules', [])
 
     st.subheader(f"Current Rules ({len(rules)})")
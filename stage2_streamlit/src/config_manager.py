@@ -1,50 +1,237 @@
+import copy
+from collections import Counter
+from collections.abc import Hashable
+import orjson
+import os
+import threading
 import yaml
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 import shutil
 
+# Prefer the libyaml C parser/emitter when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+class _RulesDumper(SafeDumper):
+    """Safe dumper for rule configs, which never share objects and so need no anchors/aliases"""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+# No line wrapping: rule reasons are emitted on one line without width bookkeeping
+_DUMP_WIDTH = 2 ** 30
+
+# Rule validation tables
+_REQUIRED = ('id', 'name', 'logic', 'outcome')
+_REQUIRED_KEYS = frozenset(_REQUIRED)
+_VALID_LOGIC = frozenset({'AND', 'OR', 'ALWAYS'})
+_VALID_DECISION = frozenset({'ALLOW', 'REVIEW', 'BLOCK'})
+
 class ConfigManager:
     """Manage rule configurations with versioning and validation"""
 
+    # Parsed configs keyed by path, valid while the file's (mtime_ns, size) is unchanged
+    _cache: Dict[Path, Tuple[int, int, Dict[str, Any]]] = {}
+
     def __init__(self, config_dir: str = "config"):
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(exist_ok=True)
         self.backup_dir = self.config_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        # Open edit() transactions by version; per thread since Streamlit sessions share instances
+        self._local = threading.local()
+
+    def get_json_path(self, version: str = "v1") -> Path:
+        """Path of the JSON rules store for a version, authoritative once written"""
+        return self.config_dir / f"rules_{version}.json"
+
+    def get_yaml_path(self, version: str = "v1") -> Path:
+        """Path of the hand-edited YAML rules for a version"""
+        return self.config_dir / f"rules_{version}.yaml"
+
+    def get_rules_path(self, version: str = "v1") -> Path:
+        """Path rules are loaded from: the JSON store if it exists, else the YAML"""
+        json_path = self.get_json_path(version)
+        return json_path if json_path.exists() else self.get_yaml_path(version)
+
+    def get_export_path(self, version: str = "v1") -> Path:
+        """Default YAML export target, kept apart from the hand-edited YAML"""
+        return self.config_dir / f"rules_{version}.export.yaml"
+
+    def yaml_has_unimported_edits(self, version: str = "v1") -> bool:
+        """Whether the YAML was changed after the JSON store was written and differs from it"""
+        json_path, yaml_path = self.get_json_path(version), self.get_yaml_path(version)
+        try:
+            if yaml_path.stat().st_mtime_ns <= json_path.stat().st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            # Without a store the YAML is loaded directly; without a YAML there is nothing to import
+            return False
+        return self._read_yaml(yaml_path) != self.load_rules(version)
+
+    def _sidecar_path(self, config_path: Path) -> Path:
+        """JSON copy of a parsed rules file, loaded instead of re-parsing unchanged YAML"""
+        return config_path.with_name(config_path.name + ".json")
+
+    def _load_sidecar(self, config_path: Path, yaml_stat: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """Parsed YAML from the sidecar, if it was written for exactly this version of the file"""
+        try:
+            sidecar = orjson.loads(self._sidecar_path(config_path).read_bytes())
+            if (sidecar['yaml_mtime_ns'], sidecar['yaml_size']) != yaml_stat:
+                return None
+            return sidecar['config']
+        except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+            # Missing, stale or corrupt sidecars fall back to the YAML
+            return None
+
+    def _write_sidecar(self, config_path: Path, yaml_stat: Tuple[int, int], config: Dict[str, Any]) -> None:
+        try:
+            data = orjson.dumps(config)
+            # orjson silently turns dates into strings and NaN into null; only cache exact round trips
+            if orjson.loads(data) != config:
+                return
+            header = orjson.dumps({'yaml_mtime_ns': yaml_stat[0], 'yaml_size': yaml_stat[1]})
+            self._sidecar_path(config_path).write_bytes(header[:-1] + b',"config":' + data + b'}')
+        except (OSError, TypeError):
+            # Not writable, or the YAML holds values JSON can't represent: skip the sidecar
+            pass
+
+    def _read_yaml(self, yaml_path: Path) -> Dict[str, Any]:
+        st = os.stat(yaml_path)
+        yaml_stat = (st.st_mtime_ns, st.st_size)
+        config = self._load_sidecar(yaml_path, yaml_stat)
+        if config is None:
+            with open(yaml_path, 'rb') as f:
+                config = yaml.load(f.read(), Loader=SafeLoader)
+            self._write_sidecar(yaml_path, yaml_stat, config)
+        return config
+
+    def _load_fast(self, config_path: Path) -> Dict[str, Any]:
+        """Parse a rules file, JSON store or YAML"""
+        if config_path.suffix == '.json':
+            return orjson.loads(config_path.read_bytes())
+        return self._read_yaml(config_path)
 
     def load_rules(self, version: str = "v1") -> Dict[str, Any]:
-        """Load rules from YAML file"""
-        config_path = self.config_dir / f"rules_{version}.yaml"
+        """Load rules from the JSON store, falling back to the YAML file"""
+        config_path = self.get_rules_path(version)
         if not config_path.exists():
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        st = os.stat(config_path)
+        cached = self._cache.get(config_path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            # Callers mutate the returned config, so never hand out the cached dict
+            return copy.deepcopy(cached[2])
+
+        config = self._load_fast(config_path)
+        self._cache[config_path] = (st.st_mtime_ns, st.st_size, config)
+        return copy.deepcopy(config)
 
     def save_rules(self, rules_config: Dict[str, Any], version: str = "v1", backup: bool = True) -> None:
-        """Save rules to YAML file with optional backup"""
-        config_path = self.config_dir / f"rules_{version}.yaml"
+        """Save rules to the JSON store with optional backup"""
+        config_path = self.get_json_path(version)
 
         # Create backup if file exists
         if backup and config_path.exists():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = self.backup_dir / f"rules_{version}_{timestamp}.yaml"
+            backup_path = self.backup_dir / f"rules_{version}_{timestamp}.json"
+            self._backup(config_path, backup_path)
+
+        # Write to a temp file and rename it over the config, so readers never see a partial file
+        tmp_path = config_path.with_suffix('.json.tmp')
+        tmp_path.write_bytes(orjson.dumps(rules_config, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, config_path)
+
+        st = os.stat(config_path)
+        self._cache[config_path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(rules_config))
+
+    def import_yaml(self, version: str = "v1", yaml_path: Optional[str] = None) -> Dict[str, Any]:
+        """Replace the JSON store with rules parsed from YAML (default: the version's YAML file)"""
+        config = self._read_yaml(Path(yaml_path) if yaml_path else self.get_yaml_path(version))
+        self.save_rules(config, version)
+        return config
+
+    def export_yaml(self, version: str = "v1", yaml_path: Optional[str] = None) -> Path:
+        """Write the current rules as YAML (default: the version's export file) and return its path"""
+        config = self.load_rules(version)
+        export_path = Path(yaml_path) if yaml_path else self.get_export_path(version)
+
+        # Exports drop YAML comments, so keep whatever file is being replaced
+        if export_path.exists():
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._backup(export_path, self.backup_dir / f"{export_path.stem}_{timestamp}.yaml")
+
+        tmp_path = export_path.with_name(export_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yaml.dump(
+                config, f, Dumper=_RulesDumper, default_flow_style=False, sort_keys=False,
+                allow_unicode=True, width=_DUMP_WIDTH
+            )
+        os.replace(tmp_path, export_path)
+        return export_path
+
+    def _backup(self, config_path: Path, backup_path: Path) -> None:
+        """Snapshot the current config file into the backup directory
+
+        Saves replace the config file instead of rewriting it, so the old file
+        can be kept with a hard link rather than copying its contents.
+        """
+        try:
+            backup_path.unlink(missing_ok=True)
+            os.link(config_path, backup_path)
+        except OSError:
+            # No hard links on this filesystem (or across devices)
             shutil.copy2(config_path, backup_path)
 
-        # Save new config
-        with open(config_path, 'w') as f:
-            yaml.safe_dump(rules_config, f, default_flow_style=False, sort_keys=False)
+    @contextmanager
+    def edit(self, version: str = "v1", backup: bool = True) -> Iterator[Dict[str, Any]]:
+        """Load a config once, yield it for in-place changes and save it once on exit
+
+        Nested edits of the same version (including the add/update/delete/reorder
+        helpers) join the outermost one, so chained changes cost one load, one
+        save and one backup. Nothing is saved if the block raises or leaves the
+        config unchanged. Refuses to start while the YAML has unimported edits.
+        """
+        edits = self._local.__dict__.setdefault('edits', {})
+        if version in edits:
+            yield edits[version]
+            return
+
+        if self.yaml_has_unimported_edits(version):
+            # Saving the store now would silently bury the hand edits
+            raise ValueError(
+                f"{self.get_yaml_path(version)} has edits not in {self.get_json_path(version)}; import them or export the store over the YAML first"
+            )
+
+        config = self.load_rules(version)
+        original = copy.deepcopy(config)
+        edits[version] = config
+        try:
+            yield config
+        finally:
+            del edits[version]
+        if config != original:
+            self.save_rules(config, version, backup=backup)
 
     def validate_rule(self, rule: Dict[str, Any]) -> List[str]:
         """Validate a single rule and return list of errors"""
         errors = []
 
         # Required fields
-        required = ['id', 'name', 'logic', 'outcome']
-        for field in required:
-            if field not in rule:
-                errors.append(f"Missing required field: {field}")
+        if not rule.keys() >= _REQUIRED_KEYS:
+            for field in _REQUIRED:
+                if field not in rule:
+                    errors.append(f"Missing required field: {field}")
+
+        # Hand-edited YAML can give a list or mapping where a scalar id belongs
+        if 'id' in rule and not isinstance(rule['id'], Hashable):
+            errors.append(f"Invalid id: {rule['id']}. Must be a single string or number")
 
         # Validate conditions (except for ALWAYS logic)
         if rule.get('logic') != 'ALWAYS':
@@ -59,8 +246,8 @@ class ConfigManager:
                     if 'value' not in cond:
                         errors.append(f"Condition {i+1}: missing 'value'")
 
-        # Validate logic
-        if 'logic' in rule and rule['logic'] not in ['AND', 'OR', 'ALWAYS']:
+        # Validate logic (the str check keeps unhashable YAML values out of the set lookup)
+        if 'logic' in rule and (not isinstance(rule['logic'], str) or rule['logic'] not in _VALID_LOGIC):
             errors.append(f"Invalid logic: {rule['logic']}. Must be AND, OR, or ALWAYS")
 
         # Validate outcome
@@ -76,7 +263,7 @@ class ConfigManager:
             # Decision
             if 'decision' not in outcome:
                 errors.append("Outcome missing 'decision'")
-            elif outcome['decision'] not in ['ALLOW', 'REVIEW', 'BLOCK']:
+            elif not isinstance(outcome['decision'], str) or outcome['decision'] not in _VALID_DECISION:
                 errors.append(f"Invalid decision: {outcome['decision']}. Must be ALLOW, REVIEW, or BLOCK")
 
             # Reason
@@ -110,11 +297,11 @@ class ConfigManager:
         if not has_default:
             errors.append("Config must have a DEFAULT rule with logic: ALWAYS at the end")
 
-        # Check for duplicate IDs
-        ids = [r.get('id') for r in rules if 'id' in r]
-        duplicates = [id for id in ids if ids.count(id) > 1]
-        if duplicates:
-            errors.append(f"Duplicate rule IDs found: {set(duplicates)}")
+        # Check for duplicate IDs (unhashable YAML ids are reported by validate_rule instead)
+        ids = [r['id'] for r in rules if isinstance(r.get('id'), Hashable)]
+        if len(ids) != len(set(ids)):
+            duplicates = {rule_id for rule_id, count in Counter(ids).items() if count > 1}
+            errors.append(f"Duplicate rule IDs found: {duplicates}")
 
         # Validate each rule
         for i, rule in enumerate(rules):
@@ -144,60 +331,51 @@ class ConfigManager:
 
     def add_rule(self, rule: Dict[str, Any], version: str = "v1", position: Optional[int] = None) -> None:
         """Add a new rule to config at specified position (default: before DEFAULT)"""
-        config = self.load_rules(version)
-        rules = config['rules']
+        with self.edit(version) as config:
+            rules = config['rules']
 
-        # Find DEFAULT rule position
-        default_idx = len(rules)
-        for i, r in enumerate(rules):
-            if r.get('logic') == 'ALWAYS':
-                default_idx = i
-                break
+            # Find DEFAULT rule position
+            default_idx = len(rules)
+            for i, r in enumerate(rules):
+                if r.get('logic') == 'ALWAYS':
+                    default_idx = i
+                    break
 
-        # Insert at position or before DEFAULT
-        insert_pos = position if position is not None else default_idx
-        rules.insert(insert_pos, rule)
-
-        config['rules'] = rules
-        self.save_rules(config, version)
+            # Insert at position or before DEFAULT
+            insert_pos = position if position is not None else default_idx
+            rules.insert(insert_pos, rule)
 
     def update_rule(self, rule_id: str, updated_rule: Dict[str, Any], version: str = "v1") -> bool:
         """Update an existing rule"""
-        config = self.load_rules(version)
-        rules = config['rules']
+        with self.edit(version) as config:
+            rules = config['rules']
 
-        for i, r in enumerate(rules):
-            if r.get('id') == rule_id:
-                rules[i] = updated_rule
-                config['rules'] = rules
-                self.save_rules(config, version)
-                return True
+            for i, r in enumerate(rules):
+                if r.get('id') == rule_id:
+                    rules[i] = updated_rule
+                    return True
 
         return False
 
     def delete_rule(self, rule_id: str, version: str = "v1") -> bool:
         """Delete a rule by ID"""
-        config = self.load_rules(version)
-        rules = config['rules']
+        with self.edit(version) as config:
+            rules = config['rules']
 
-        new_rules = [r for r in rules if r.get('id') != rule_id]
-        if len(new_rules) < len(rules):
-            config['rules'] = new_rules
-            self.save_rules(config, version)
-            return True
+            new_rules = [r for r in rules if r.get('id') != rule_id]
+            if len(new_rules) < len(rules):
+                config['rules'] = new_rules
+                return True
 
         return False
 
     def reorder_rules(self, rule_ids: List[str], version: str = "v1") -> None:
         """Reorder rules based on list of IDs"""
-        config = self.load_rules(version)
-        rules = config['rules']
+        with self.edit(version) as config:
+            rules = config['rules']
 
-        # Create mapping of ID to rule
-        rule_map = {r.get('id'): r for r in rules}
+            # Create mapping of ID to rule
+            rule_map = {r.get('id'): r for r in rules}
 
-        # Reorder based on provided IDs
-        new_rules = [rule_map[rid] for rid in rule_ids if rid in rule_map]
-
-        config['rules'] = new_rules
-        self.save_rules(config, version)
+            # Reorder based on provided IDs
+            config['rules'] = [rule_map[rid] for rid in rule_ids if rid in rule_map]
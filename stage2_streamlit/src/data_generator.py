@@ -1,9 +1,14 @@
 import random
-from faker import Faker
+import uuid
 from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
 import pandas as pd
 
-fake = Faker()
+# random.choice sources, as tuples so they are built once
+FRAUD_PATTERNS = ('high_value_crypto', 'velocity_spike', 'gambling')
+LEGIT_CATEGORIES = ("retail", "travel", "electronics")
+BOOLEANS = (True, False)
 
 class FraudDataGenerator:
     """Generate realistic fraud detection test data"""
@@ -11,48 +16,65 @@ class FraudDataGenerator:
     MERCHANT_CATEGORIES = ["retail", "travel", "gambling", "crypto", "electronics"]
     COUNTRIES = ["US", "UK", "DE", "FR", "NG", "RU", "CN", "BR"]
     
-    def __init__(self, fraud_ratio: float = 0.15):
+    def __init__(self, fraud_ratio: float = 0.15, seed: Optional[int] = None):
         self.fraud_ratio = fraud_ratio
+        self.rng = np.random.default_rng(seed)  # Used by generate_dataset
+        self.home_countries = tuple(self.COUNTRIES[:4])  # Legitimate countries
+        self.foreign_countries = tuple(self.COUNTRIES[4:])
+        self.all_countries = tuple(self.COUNTRIES)
+        self.merchant_categories = tuple(self.MERCHANT_CATEGORIES)
+
+        # Timestamps fall between the start of the current month and now
+        now = datetime.now().replace(microsecond=0)
+        self.month_start = now.replace(day=1, hour=0, minute=0, second=0)
+        self.month_seconds = int((now - self.month_start).total_seconds())
+
+    def _transaction_id(self) -> str:
+        return uuid.uuid4().hex[:8]
+
+    def _timestamp(self) -> str:
+        offset = timedelta(seconds=random.randint(0, self.month_seconds))
+        return (self.month_start + offset).isoformat()
 
     def generate_transaction(self, is_fraud: bool = False) -> dict:
         """Generate a single transaction"""
-        account_country = random.choice(self.COUNTRIES[:4])  # Legitimate countries
+        account_country = random.choice(self.home_countries)
         
         if is_fraud:
             # Fraud patterns
-            pattern = random.choice(['high_value_crypto', 'velocity_spike', 'gambling'])
+            pattern = random.choice(FRAUD_PATTERNS)
             
             if pattern == 'high_value_crypto':
                 return {
-                    "transaction_id": fake.uuid4()[:8],
-                    "timestamp": fake.date_time_this_month().isoformat(),
+                    "transaction_id": self._transaction_id(),
+                    "timestamp": self._timestamp(),
                     "transaction_amount": random.uniform(5000, 50000),
                     "transaction_velocity_24h": random.randint(1, 5),
                     "is_new_device": True,
-                    "country_mismatch": random.choice([True, False]),
+                    "country_mismatch": random.choice(BOOLEANS),
                     "merchant_category": "crypto",
                     "account_country": account_country,
-                    "transaction_country": random.choice(self.COUNTRIES),
+                    "transaction_country": random.choice(self.all_countries),
                     "account_age_days": random.randint(1, 30),
                 }
             elif pattern == 'velocity_spike':
-                tx_country = random.choice(self.COUNTRIES[4:])  # Different country
+                tx_country = random.choice(self.foreign_countries)  # Different country
                 return {
-                    "transaction_id": fake.uuid4()[:8],
-                    "timestamp": fake.date_time_this_month().isoformat(),
+                    "transaction_id": self._transaction_id(),
+                    "timestamp": self._timestamp(),
                     "transaction_amount": random.uniform(100, 2000),
                     "transaction_velocity_24h": random.randint(11, 50),
-                    "is_new_device": random.choice([True, False]),
+                    "is_new_device": random.choice(BOOLEANS),
                     "country_mismatch": True,
-                    "merchant_category": random.choice(self.MERCHANT_CATEGORIES),
+                    "merchant_category": random.choice(self.merchant_categories),
                     "account_country": account_country,
                     "transaction_country": tx_country,
                     "account_age_days": random.randint(30, 365),
                 }
             else:  # gambling
                 return {
-                    "transaction_id": fake.uuid4()[:8],
-                    "timestamp": fake.date_time_this_month().isoformat(),
+                    "transaction_id": self._transaction_id(),
+                    "timestamp": self._timestamp(),
                     "transaction_amount": random.uniform(1000, 10000),
                     "transaction_velocity_24h": random.randint(1, 10),
                     "is_new_device": False,
@@ -65,26 +87,91 @@ class FraudDataGenerator:
         else:
             # Legitimate transaction
             return {
-                "transaction_id": fake.uuid4()[:8],
-                "timestamp": fake.date_time_this_month().isoformat(),
+                "transaction_id": self._transaction_id(),
+                "timestamp": self._timestamp(),
                 "transaction_amount": random.uniform(10, 500),
                 "transaction_velocity_24h": random.randint(1, 5),
-                "is_new_device": random.choice([True, False]),
+                "is_new_device": random.choice(BOOLEANS),
                 "country_mismatch": False,
-                "merchant_category": random.choice(["retail", "travel", "electronics"]),
+                "merchant_category": random.choice(LEGIT_CATEGORIES),
                 "account_country": account_country,
                 "transaction_country": account_country,
                 "account_age_days": random.randint(365, 2000),
             }
 
+    def _generate_columns(self, rng: np.random.Generator, n: int, pattern: str) -> dict:
+        """Generate the feature columns for n transactions of one pattern (mirrors generate_transaction)"""
+        account_country = rng.choice(self.home_countries, size=n)
+
+        if pattern == 'high_value_crypto':
+            return {
+                "transaction_amount": rng.uniform(5000, 50000, size=n),
+                "transaction_velocity_24h": rng.integers(1, 5, size=n, endpoint=True),
+                "is_new_device": np.ones(n, dtype=bool),
+                "country_mismatch": rng.choice(BOOLEANS, size=n),
+                "merchant_category": np.full(n, "crypto"),
+                "account_country": account_country,
+                "transaction_country": rng.choice(self.all_countries, size=n),
+                "account_age_days": rng.integers(1, 30, size=n, endpoint=True),
+            }
+        elif pattern == 'velocity_spike':
+            return {
+                "transaction_amount": rng.uniform(100, 2000, size=n),
+                "transaction_velocity_24h": rng.integers(11, 50, size=n, endpoint=True),
+                "is_new_device": rng.choice(BOOLEANS, size=n),
+                "country_mismatch": np.ones(n, dtype=bool),
+                "merchant_category": rng.choice(self.merchant_categories, size=n),
+                "account_country": account_country,
+                "transaction_country": rng.choice(self.foreign_countries, size=n),
+                "account_age_days": rng.integers(30, 365, size=n, endpoint=True),
+            }
+        elif pattern == 'gambling':
+            return {
+                "transaction_amount": rng.uniform(1000, 10000, size=n),
+                "transaction_velocity_24h": rng.integers(1, 10, size=n, endpoint=True),
+                "is_new_device": np.zeros(n, dtype=bool),
+                "country_mismatch": np.zeros(n, dtype=bool),
+                "merchant_category": np.full(n, "gambling"),
+                "account_country": account_country,
+                "transaction_country": account_country,
+                "account_age_days": rng.integers(100, 1000, size=n, endpoint=True),
+            }
+        else:  # legitimate
+            return {
+                "transaction_amount": rng.uniform(10, 500, size=n),
+                "transaction_velocity_24h": rng.integers(1, 5, size=n, endpoint=True),
+                "is_new_device": rng.choice(BOOLEANS, size=n),
+                "country_mismatch": np.zeros(n, dtype=bool),
+                "merchant_category": rng.choice(LEGIT_CATEGORIES, size=n),
+                "account_country": account_country,
+                "transaction_country": account_country,
+                "account_age_days": rng.integers(365, 2000, size=n, endpoint=True),
+            }
+
     def generate_dataset(self, n: int = 5) -> pd.DataFrame:
         """Generate a dataset with mix of fraud and legitimate transactions"""
         n_fraud = int(n * self.fraud_ratio)
         n_legit = n - n_fraud
-        
-        transactions = []
-        transactions.extend([self.generate_transaction(is_fraud=True) for _ in range(n_fraud)])
-        transactions.extend([self.generate_transaction(is_fraud=False) for _ in range(n_legit)])
-        
-        random.shuffle(transactions)
-        return pd.DataFrame(transactions)
\ No newline at end of file
+        rng = self.rng
+
+        # Split the fraud rows across patterns, then build each column in one shot
+        patterns = rng.choice(FRAUD_PATTERNS, size=n_fraud)
+        segments = [
+            self._generate_columns(rng, int((patterns == pattern).sum()), pattern)
+            for pattern in FRAUD_PATTERNS
+        ]
+        segments.append(self._generate_columns(rng, n_legit, 'legitimate'))
+
+        offsets = rng.integers(0, self.month_seconds, size=n, endpoint=True)
+        timestamps = np.datetime64(self.month_start, 's') + offsets.astype('timedelta64[s]')
+
+        columns = {
+            "transaction_id": np.array([f"{x:08x}" for x in rng.integers(0, 1 << 32, size=n)]),
+            "timestamp": np.datetime_as_string(timestamps, unit='s'),
+        }
+        # Shuffle by applying one permutation to each column during assembly
+        order = rng.permutation(n)
+        for column in segments[0]:
+            columns[column] = np.concatenate([segment[column] for segment in segments])[order]
+
+        return pd.DataFrame(columns)
@@ -1,6 +1,57 @@
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, Hashable, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+# Strings accepted as true when sanitizing boolean fields
+_TRUTHY = frozenset({'true', '1', 'yes', 't', 'y', 'on'})
+
+def _to_bool(val: Any) -> Any:
+    """Coerce boolean-like values, leaving anything else untouched"""
+    if isinstance(val, str):
+        return val.lower() in _TRUTHY
+    if isinstance(val, (int, float)):
+        return bool(val)
+    return val
+
+# Type coercion applied per field by sanitize_transaction
+_COERCE = {
+    'transaction_amount': float,
+    'transaction_velocity_24h': int,
+    'account_age_days': int,
+    'is_new_device': _to_bool,
+    'country_mismatch': _to_bool,
+}
+
+def _parse_csv_bool(cell: str) -> bool:
+    # Same spellings read_csv itself accepts for boolean columns
+    if cell in ('True', 'TRUE', 'true'):
+        return True
+    if cell in ('False', 'FALSE', 'false'):
+        return False
+    raise ValueError(cell)
+
+# Per-cell parsers for iter_validate_csv, so a malformed cell only affects its own row
+_CSV_PARSERS = {
+    'transaction_amount': float,
+    'transaction_velocity_24h': int,
+    'account_age_days': int,
+    'is_new_device': _parse_csv_bool,
+    'country_mismatch': _parse_csv_bool,
+}
+
+def _parse_csv_column(series: pd.Series, parse) -> pd.Series:
+    """Parse each string cell, keeping blanks as NaN and unparseable cells as the raw string"""
+    def convert(cell: Any) -> Any:
+        if not isinstance(cell, str):
+            return cell
+        try:
+            return parse(cell)
+        except ValueError:
+            return cell
+    # object dtype, since letting pandas infer would turn ints beside a NaN into floats
+    return pd.Series([convert(cell) for cell in series], index=series.index, dtype=object)
+
 class DataValidator:
     """Validate transaction data before processing"""
 
@@ -20,6 +71,9 @@ class DataValidator:
         'timestamp',
     ]
 
+    REQUIRED_FIELDS_SET = frozenset(REQUIRED_FIELDS)
+    ALL_FIELDS_SET = frozenset(REQUIRED_FIELDS + OPTIONAL_FIELDS)
+
     MERCHANT_CATEGORIES = ['retail', 'travel', 'gambling', 'crypto', 'electronics']
 
     def __init__(self):
@@ -30,9 +84,10 @@ class DataValidator:
         errors = []
 
         # Check required fields
-        for field in self.REQUIRED_FIELDS:
-            if field not in data:
-                errors.append(f"Missing required field: {field}")
+        if not self.REQUIRED_FIELDS_SET.issubset(data):
+            for field in self.REQUIRED_FIELDS:
+                if field not in data:
+                    errors.append(f"Missing required field: {field}")
 
         # Validate data types and values
         if 'transaction_amount' in data:
@@ -67,123 +122,167 @@ class DataValidator:
 
         return errors
 
-    def validate_dataframe(self, df: pd.DataFrame) -> Dict[str, List[str]]:
-        """Validate entire dataframe and return errors by row"""
-        errors_by_row = {}
+    def validate_dataframe(self, df: pd.DataFrame, max_errors: Optional[int] = None) -> Dict[str, List[str]]:
+        """Validate entire dataframe and return errors by row (at most max_errors rows)"""
+        return dict(islice(self.iter_errors(df), max_errors))
 
+    def iter_errors(self, df: pd.DataFrame) -> Iterator[Tuple[Hashable, List[str]]]:
+        """Yield (row index, errors) for each invalid row, or ('schema', errors) if columns are missing"""
         # Check for required columns
-        missing_cols = set(self.REQUIRED_FIELDS) - set(df.columns)
+        missing_cols = self.REQUIRED_FIELDS_SET.difference(df.columns)
         if missing_cols:
-            errors_by_row['schema'] = [f"Missing required columns: {missing_cols}"]
-            return errors_by_row
+            yield 'schema', [f"Missing required columns: {set(missing_cols)}"]
+            return
 
-        # Validate each row
-        for idx, row in df.iterrows():
-            row_dict = row.to_dict()
-            row_errors = self.validate_transaction(row_dict)
-            if row_errors:
-                errors_by_row[idx] = row_errors
+        # Column-wise masks in the same order validate_transaction reports errors
+        checks: List[Tuple[np.ndarray, str]] = []
+        for field, types, type_msg in (
+            ('transaction_amount', (int, float), "transaction_amount must be numeric"),
+            ('transaction_velocity_24h', int, "transaction_velocity_24h must be integer"),
+        ):
+            ok = self._type_mask(df[field], types)
+            checks.append((~ok, type_msg))
+            checks.append((self._negative_mask(df[field], ok), f"{field} cannot be negative"))
 
-        return errors_by_row
+        checks.append((
+            ~df['merchant_category'].isin(self.MERCHANT_CATEGORIES).to_numpy(),
+            f"Invalid merchant_category. Must be one of: {self.MERCHANT_CATEGORIES}"
+        ))
+        for field in ('is_new_device', 'country_mismatch'):
+            checks.append((~self._type_mask(df[field], bool), f"{field} must be boolean (true/false)"))
+
+        if 'account_age_days' in df.columns:
+            ok = self._type_mask(df['account_age_days'], int)
+            checks.append((~ok, "account_age_days must be integer"))
+            checks.append((self._negative_mask(df['account_age_days'], ok), "account_age_days cannot be negative"))
+
+        # Only rows with at least one failing check produce an entry
+        failed = np.logical_or.reduce([mask for mask, _ in checks])
+        for pos in np.flatnonzero(failed):
+            yield df.index[pos], [msg for mask, msg in checks if mask[pos]]
+
+    def iter_validate_csv(self, path_or_buf: Any, chunksize: int = 10_000) -> Iterator[Tuple[Hashable, List[str]]]:
+        """Validate a CSV in chunks, yielding iter_errors pairs with memory bounded by chunksize
+
+        Typed fields are parsed cell by cell rather than by per-chunk dtype
+        inference, so a malformed cell flags only its own row and the result
+        does not depend on chunksize.
+        """
+        dtype = dict.fromkeys(_CSV_PARSERS, object)
+        with pd.read_csv(path_or_buf, chunksize=chunksize, dtype=dtype) as reader:
+            for chunk in reader:
+                for field in _CSV_PARSERS.keys() & set(chunk.columns):
+                    chunk[field] = _parse_csv_column(chunk[field], _CSV_PARSERS[field])
+                for key, errors in self.iter_errors(chunk):
+                    yield key, errors
+                    if key == 'schema':
+                        return
+
+    @staticmethod
+    def _type_mask(series: pd.Series, types) -> np.ndarray:
+        """Vectorized isinstance(value, types) over a column, matching per-row checks"""
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            # Every value in a bool/int/float column is the same Python type
+            python_type = type(np.zeros(1, dtype=dtype).item())
+            return np.full(len(series), issubclass(python_type, types))
+        return np.fromiter(
+            (isinstance(value, types) for value in series.astype(object)),
+            dtype=bool,
+            count=len(series)
+        )
+
+    @staticmethod
+    def _negative_mask(series: pd.Series, ok: np.ndarray) -> np.ndarray:
+        """Rows whose value passed the type check and is below zero"""
+        negative = np.zeros(len(series), dtype=bool)
+        if ok.any():
+            values = series.to_numpy()[ok]
+            if values.dtype == object:
+                values = values.astype(float)
+            negative[ok] = values < 0
+        return negative
 
     def sanitize_transaction(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Clean and sanitize transaction data"""
         sanitized = {}
 
-        # Copy only known fields
+        # Copy only known fields, converting types in the same pass
         for field in self.all_fields:
             if field in data:
-                sanitized[field] = data[field]
-
-        # Convert types
-        if 'transaction_amount' in sanitized:
-            try:
-                sanitized['transaction_amount'] = float(sanitized['transaction_amount'])
-            except (ValueError, TypeError):
-                pass
-
-        if 'transaction_velocity_24h' in sanitized:
-            try:
-                sanitized['transaction_velocity_24h'] = int(sanitized['transaction_velocity_24h'])
-            except (ValueError, TypeError):
-                pass
-
-        if 'account_age_days' in sanitized:
-            try:
-                sanitized['account_age_days'] = int(sanitized['account_age_days'])
-            except (ValueError, TypeError):
-                pass
-
-        # Convert boolean-like values
-        for bool_field in ['is_new_device', 'country_mismatch']:
-            if bool_field in sanitized:
-                val = sanitized[bool_field]
-                if isinstance(val, str):
-                    sanitized[bool_field] = val.lower() in ['true', '1', 'yes', 't']
-                elif isinstance(val, (int, float)):
-                    sanitized[bool_field] = bool(val)
+                value = data[field]
+                coerce = _COERCE.get(field)
+                if coerce is not None:
+                    try:
+                        value = coerce(value)
+                    except (ValueError, TypeError):
+                        pass
+                sanitized[field] = value
 
         return sanitized
 
     def check_required_fields(self, data: Dict[str, Any]) -> bool:
         """Quick check if all required fields are present"""
-        return all(field in data for field in self.REQUIRED_FIELDS)
+        return self.REQUIRED_FIELDS_SET.issubset(data)
 
     def get_field_info(self) -> Dict[str, Dict[str, str]]:
-        """Get metadata about available fields"""
-        return {
-            'transaction_id': {
-                'type': 'string',
-                'description': 'Unique transaction identifier',
-                'required': True
-            },
-            'transaction_amount': {
-                'type': 'number',
-                'description': 'Transaction amount in dollars',
-                'required': True,
-                'validation': 'Must be >= 0'
-            },
-            'transaction_velocity_24h': {
-                'type': 'integer',
-                'description': 'Number of transactions in last 24 hours',
-                'required': True,
-                'validation': 'Must be >= 0'
-            },
-            'merchant_category': {
-                'type': 'string',
-                'description': 'Type of merchant',
-                'required': True,
-                'validation': f'Must be one of: {", ".join(self.MERCHANT_CATEGORIES)}'
-            },
-            'is_new_device': {
-                'type': 'boolean',
-                'description': 'Transaction from unrecognized device',
-                'required': True
-            },
-            'country_mismatch': {
-                'type': 'boolean',
-                'description': 'Transaction country differs from account country',
-                'required': True
-            },
-            'account_age_days': {
-                'type': 'integer',
-                'description': 'Age of account in days',
-                'required': False,
-                'validation': 'Must be >= 0'
-            },
-            'account_country': {
-                'type': 'string',
-                'description': 'Account registration country',
-                'required': False
-            },
-            'transaction_country': {
-                'type': 'string',
-                'description': 'Transaction origin country',
-                'required': False
-            },
-            'timestamp': {
-                'type': 'string',
-                'description': 'Transaction timestamp (ISO format)',
-                'required': False
-            }
-        }
+        """Get metadata about available fields (shared module constant, do not mutate)"""
+        return _FIELD_INFO
+
+# Field metadata is static, so build it once at import time
+_FIELD_INFO: Dict[str, Dict[str, Any]] = {
+    'transaction_id': {
+        'type': 'string',
+        'description': 'Unique transaction identifier',
+        'required': True
+    },
+    'transaction_amount': {
+        'type': 'number',
+        'description': 'Transaction amount in dollars',
+        'required': True,
+        'validation': 'Must be >= 0'
+    },
+    'transaction_velocity_24h': {
+        'type': 'integer',
+        'description': 'Number of transactions in last 24 hours',
+        'required': True,
+        'validation': 'Must be >= 0'
+    },
+    'merchant_category': {
+        'type': 'string',
+        'description': 'Type of merchant',
+        'required': True,
+        'validation': f'Must be one of: {", ".join(DataValidator.MERCHANT_CATEGORIES)}'
+    },
+    'is_new_device': {
+        'type': 'boolean',
+        'description': 'Transaction from unrecognized device',
+        'required': True
+    },
+    'country_mismatch': {
+        'type': 'boolean',
+        'description': 'Transaction country differs from account country',
+        'required': True
+    },
+    'account_age_days': {
+        'type': 'integer',
+        'description': 'Age of account in days',
+        'required': False,
+        'validation': 'Must be >= 0'
+    },
+    'account_country': {
+        'type': 'string',
+        'description': 'Account registration country',
+        'required': False
+    },
+    'transaction_country': {
+        'type': 'string',
+        'description': 'Transaction origin country',
+        'required': False
+    },
+    'timestamp': {
+        'type': 'string',
+        'description': 'Transaction timestamp (ISO format)',
+        'required': False
+    }
+}
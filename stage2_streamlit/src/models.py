@@ -14,10 +14,11 @@ class Confidence(str, Enum):
 
 class RuleResult(BaseModel):
     """Output from rule engine (deterministic)"""
+    # risk_score is range-checked once when RuleEngine loads the rules
     transaction_id: str
     matched_rule_id: str
     matched_rule_name: str
-    risk_score: int = Field(ge=0, le=100)
+    risk_score: int
     decision: Decision
     rule_reason: str
 
@@ -1,50 +1,156 @@
+import operator
 import yaml
-from typing import Any
+import numpy as np
+import pandas as pd
+from typing import Any, Callable
 from .models import RuleResult, Decision
 
+# Prefer the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+def _is_missing(value: Any) -> bool:
+    """None, NaN, NaT or pd.NA: the values DataFrame.notna() treats as absent"""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return True
+    return isinstance(value, (float, np.floating)) and value != value
+
 class RuleEngine:
     OPERATORS = {
-        ">": lambda a, b: a > b,
-        "<": lambda a, b: a < b,
-        ">=": lambda a, b: a >= b,
-        "<=": lambda a, b: a <= b,
-        "==": lambda a, b: a == b,
-        "!=": lambda a, b: a != b,
+        ">": operator.gt,
+        "<": operator.lt,
+        ">=": operator.ge,
+        "<=": operator.le,
+        "==": operator.eq,
+        "!=": operator.ne,
         "in": lambda a, b: a in b,
         "not_in": lambda a, b: a not in b,
     }
 
+    # Python source for each operator, used when compiling rules to predicates
+    OPERATOR_SOURCE = {
+        ">": "{a} > {b}",
+        "<": "{a} < {b}",
+        ">=": "{a} >= {b}",
+        "<=": "{a} <= {b}",
+        "==": "{a} == {b}",
+        "!=": "{a} != {b}",
+        "in": "{a} in {b}",
+        "not_in": "{a} not in {b}",
+    }
+
     def __init__(self, config_path: str):
         with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=SafeLoader)
         self.rules = self.config['rules']
         self.version = self.config['version']
+        for rule in self.rules:
+            rule['_pred'] = self.compile_rule(rule)
+            # Everything in a RuleResult except transaction_id is fixed per rule
+            outcome = rule['outcome']
+            risk_score = outcome['risk_score']
+            if not isinstance(risk_score, int) or not 0 <= risk_score <= 100:
+                raise ValueError(f"Rule {rule['id']}: risk_score must be integer 0-100, got {risk_score!r}")
+            rule['_result'] = {
+                'matched_rule_id': rule['id'],
+                'matched_rule_name': rule['name'],
+                'risk_score': risk_score,
+                'decision': Decision(outcome['decision']),
+                'rule_reason': outcome['reason'],
+            }
+        self._build_index()
+
+    def _resolve_operator(self, operator_name: str) -> Callable[[Any, Any], bool]:
+        op_func = self.OPERATORS.get(operator_name)
+        if not op_func:
+            raise ValueError(f"Unknown operator: {operator_name}")
+        return op_func
+
+    def _build_index(self) -> None:
+        """Index rules by one equality anchor so evaluate() can skip rules that cannot match
+
+        An AND rule with a `field == value` condition on a string or boolean value
+        can only match records whose field equals that value, so it is filed under
+        (field, value). Every other rule is unindexed and always checked.
+        """
+        self.index: dict[tuple, list[int]] = {}
+        self.unindexed: list[int] = []
+        for i, rule in enumerate(self.rules):
+            anchor = None
+            if rule.get('logic') == 'AND':
+                for condition in rule.get('conditions') or []:
+                    if condition['operator'] == '==' and isinstance(condition['value'], (str, bool)):
+                        anchor = (condition['field'], condition['value'])
+                        break
+            if anchor is None:
+                self.unindexed.append(i)
+            else:
+                self.index.setdefault(anchor, []).append(i)
+        self.index_fields = tuple(dict.fromkeys(field for field, _ in self.index))
+
+    def candidate_rules(self, record: dict) -> list[int]:
+        """Positions of the rules that can match this record, in rule order"""
+        candidates = list(self.unindexed)
+        for field in self.index_fields:
+            try:
+                bucket = self.index.get((field, record.get(field)))
+            except TypeError:
+                # Unhashable value can never equal a str/bool anchor
+                continue
+            if bucket:
+                candidates.extend(bucket)
+        candidates.sort()
+        return candidates
+
+    def compile_rule(self, rule: dict) -> Callable[[dict], bool]:
+        """Compile a rule into a single predicate with the same semantics as evaluate_rule"""
+        logic = rule.get('logic')
+        if logic == 'ALWAYS':
+            return lambda record: True
+
+        conditions = rule.get('conditions', [])
+        if not conditions or logic not in ('AND', 'OR'):
+            return lambda record: False
+
+        # Fields and expected values are bound as names rather than inlined as
+        # literals, so arbitrary YAML values cannot alter the generated code
+        namespace = {'__builtins__': {}, '_missing': _is_missing}
+        clauses = []
+        for i, condition in enumerate(conditions):
+            template = self.OPERATOR_SOURCE.get(condition['operator'])
+            if template is None:
+                raise ValueError(f"Unknown operator: {condition['operator']}")
+            namespace[f'_f{i}'] = condition['field']
+            namespace[f'_v{i}'] = condition['value']
+            comparison = template.format(a=f'_a{i}', b=f'_v{i}')
+            clauses.append(f"(not _missing(_a{i} := r.get(_f{i})) and {comparison})")
+
+        joiner = ' and ' if logic == 'AND' else ' or '
+        source = f"lambda r: {joiner.join(clauses)}"
+        return eval(compile(source, f"<rule {rule.get('id')}>", 'eval'), namespace)
 
     def evaluate_condition(self, condition: dict, record: dict) -> bool:
-        field = condition['field']
-        operator = condition['operator']
-        expected_value = condition['value']
-        actual_value = record.get(field)
-        
-        if actual_value is None:
+        actual_value = record.get(condition['field'])
+        # Blank DataFrame cells arrive as NaN; they are missing too, as in condition_mask
+        if _is_missing(actual_value):
             return False
-        
-        op_func = self.OPERATORS.get(operator)
-        if not op_func:
-            raise ValueError(f"Unknown operator: {operator}")
-        
-        return op_func(actual_value, expected_value)
+
+        op_func = self._resolve_operator(condition['operator'])
+        return op_func(actual_value, condition['value'])
 
     def evaluate_rule(self, rule: dict, record: dict) -> bool:
         if rule.get('logic') == 'ALWAYS':
             return True
-        
-        conditions = rule.get('conditions', [])
+
+        conditions = rule.get('conditions') or []
         if not conditions:
             return False
-        
-        results = [self.evaluate_condition(c, record) for c in conditions]
-        
+
+        # Generator lets all()/any() stop at the first deciding condition
+        results = (self.evaluate_condition(c, record) for c in conditions)
+
         if rule.get('logic') == 'AND':
             return all(results)
         elif rule.get('logic') == 'OR':
@@ -55,21 +161,97 @@ class RuleEngine:
         """Evaluate a single record against all rules"""
         transaction_id = record.get('transaction_id', 'unknown')
         
-        for rule in self.rules:
-            if self.evaluate_rule(rule, record):
-                outcome = rule['outcome']
-                return RuleResult(
-                    transaction_id=transaction_id,
-                    matched_rule_id=rule['id'],
-                    matched_rule_name=rule['name'],
-                    risk_score=outcome['risk_score'],
-                    decision=Decision(outcome['decision']),
-                    rule_reason=outcome['reason']
-                )
+        for i in self.candidate_rules(record):
+            rule = self.rules[i]
+            if rule['_pred'](record):
+                return RuleResult(transaction_id=transaction_id, **rule['_result'])
         
         # Should never reach here if DEFAULT rule exists
         raise ValueError("No matching rule found and no DEFAULT rule defined")
 
     def evaluate_batch(self, records: list[dict]) -> list[RuleResult]:
         """Evaluate multiple records"""
-        return [self.evaluate(record) for record in records]
\ No newline at end of file
+        results: list[RuleResult] = [None] * len(records)
+        evaluate = self.evaluate
+        for i, record in enumerate(records):
+            results[i] = evaluate(record)
+        return results
+
+    def condition_mask(self, condition: dict, df: pd.DataFrame) -> np.ndarray:
+        """Vectorized evaluate_condition: boolean mask of rows matching the condition"""
+        mask = np.zeros(len(df), dtype=bool)
+        field = condition['field']
+        if field not in df.columns:
+            return mask
+
+        op_name = condition['operator']
+        expected_value = condition['value']
+        op_func = self.OPERATORS.get(op_name)
+        if not op_func:
+            raise ValueError(f"Unknown operator: {op_name}")
+
+        # Missing values (None/NaN/NaT/NA) never match, same as in evaluate_condition
+        present = df[field].notna().to_numpy()
+        if not present.any():
+            return mask
+        column = df[field][present]
+
+        if op_name in ('in', 'not_in') and isinstance(expected_value, (list, tuple, set)):
+            matches = column.isin(expected_value)
+            if op_name == 'not_in':
+                matches = ~matches
+        elif op_name in ('in', 'not_in'):
+            matches = column.map(lambda value: op_func(value, expected_value))
+        else:
+            matches = op_func(column, expected_value)
+
+        mask[present] = np.asarray(matches, dtype=bool)
+        return mask
+
+    def rule_mask(self, rule: dict, df: pd.DataFrame) -> np.ndarray:
+        """Vectorized evaluate_rule: boolean mask of rows matching the rule"""
+        if rule.get('logic') == 'ALWAYS':
+            return np.ones(len(df), dtype=bool)
+
+        conditions = rule.get('conditions', [])
+        if not conditions:
+            return np.zeros(len(df), dtype=bool)
+
+        masks = [self.condition_mask(c, df) for c in conditions]
+
+        if rule.get('logic') == 'AND':
+            return np.logical_and.reduce(masks)
+        elif rule.get('logic') == 'OR':
+            return np.logical_or.reduce(masks)
+        return np.zeros(len(df), dtype=bool)
+
+    def evaluate_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Evaluate every row of a DataFrame at once
+
+        Returns one row per input row (same index) with the RuleResult fields
+        as columns. First-match semantics are preserved: np.select picks the
+        first rule whose mask is true for each row.
+        """
+        masks = [self.rule_mask(rule, df) for rule in self.rules]
+        if len(df) and not np.logical_or.reduce(masks).all():
+            # Should never reach here if DEFAULT rule exists
+            raise ValueError("No matching rule found and no DEFAULT rule defined")
+
+        matched = np.select(masks, np.arange(len(self.rules)), default=-1)
+
+        def column(values: list) -> np.ndarray:
+            return np.array(values, dtype=object)[matched]
+
+        if 'transaction_id' in df.columns:
+            transaction_ids = df['transaction_id'].to_numpy()
+        else:
+            transaction_ids = np.full(len(df), 'unknown', dtype=object)
+
+        return pd.DataFrame({
+            'transaction_id': transaction_ids,
+            'matched_rule_id': column([r['id'] for r in self.rules]),
+            'matched_rule_name': column([r['name'] for r in self.rules]),
+            'risk_score': np.array([r['outcome']['risk_score'] for r in self.rules])[matched],
+            'decision': column([Decision(r['outcome']['decision']) for r in self.rules]),
+            'rule_reason': column([r['outcome']['reason'] for r in self.rules]),
+        }, index=df.index)
\ No newline at end of file
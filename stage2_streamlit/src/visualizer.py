@@ -1,6 +1,13 @@
 import plotly.graph_objects as go
-from typing import Dict, Any, List, Tuple
-import networkx as nx
+from functools import lru_cache
+from typing import Dict, Any, List
+import numpy as np
+import orjson
+
+# Box edges for create_simple_flowchart
+_HLINE = '─' * 40
+_TOP = f"┌{_HLINE}┐"
+_BOT = f"└{_HLINE}┘"
 
 class RuleVisualizer:
     """Create interactive decision tree visualizations for rules"""
@@ -18,24 +25,32 @@ class RuleVisualizer:
         pass
 
     def create_decision_tree(self, rules: List[Dict[str, Any]]) -> go.Figure:
-        """Create interactive Plotly decision tree from rules"""
-
-        # Create directed graph
-        G = nx.DiGraph()
-
-        # Add root node
-        G.add_node("START", label="Transaction", node_type="root", level=0)
-
-        # Build tree structure
-        prev_node = "START"
-        for idx, rule in enumerate(rules):
-            rule_id = rule.get('id', f'RULE_{idx}')
+        """Create interactive Plotly decision tree from rules
+
+        Figures are memoized on the rules' content, so the returned figure may be
+        shared between calls and should not be modified in place.
+        """
+        try:
+            rules_key = orjson.dumps(rules, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # Rules holding values JSON can't represent are not cached
+            return self._build_decision_tree(rules)
+        return _cached_decision_tree(type(self), rules_key)
+
+    def _build_decision_tree(self, rules: List[Dict[str, Any]]) -> go.Figure:
+        n = len(rules)
+
+        # Nodes as parallel arrays: START, then a condition and an outcome node per rule
+        node_text = ["Transaction"]
+        node_color = ['#6B7280']
+        node_size = [30]
+
+        for rule in rules:
             rule_name = rule.get('name', 'Unnamed Rule')
             decision = rule.get('outcome', {}).get('decision', 'UNKNOWN')
             risk_score = rule.get('outcome', {}).get('risk_score', 0)
 
-            # Create condition node
-            condition_node = f"cond_{rule_id}"
+            # Condition node
             conditions = rule.get('conditions', [])
             logic = rule.get('logic', 'AND')
 
@@ -51,78 +66,51 @@ class RuleVisualizer:
             else:
                 condition_label = rule_name
 
-            G.add_node(
-                condition_node,
-                label=condition_label,
-                node_type="condition",
-                level=idx + 1,
-                rule_id=rule_id
-            )
-
-            # Create outcome node
-            outcome_node = f"outcome_{rule_id}"
-            outcome_label = f"{decision}\nRisk: {risk_score}"
-
-            G.add_node(
-                outcome_node,
-                label=outcome_label,
-                node_type="outcome",
-                decision=decision,
-                risk_score=risk_score,
-                level=idx + 1,
-                rule_id=rule_id
-            )
-
-            # Add edges
-            G.add_edge(prev_node, condition_node, label="check")
-            G.add_edge(condition_node, outcome_node, label="match")
-
-            # Connect to next rule if not last
-            if idx < len(rules) - 1:
-                next_cond = f"cond_{rules[idx+1].get('id', f'RULE_{idx+1}')}"
-                G.add_edge(condition_node, next_cond, label="no match")
-
-        # Generate layout
-        pos = self._generate_layout(G, rules)
-
-        # Create plotly figure
-        fig = self._create_plotly_figure(G, pos)
-
-        return fig
-
-    def _generate_layout(self, G: nx.DiGraph, rules: List[Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
-        """Generate positions for nodes"""
-        pos = {}
-
-        # Start node at top
-        pos["START"] = (0, len(rules) + 1)
-
-        # Layout rules vertically with horizontal spacing for outcomes
-        for idx, rule in enumerate(rules):
-            rule_id = rule.get('id', f'RULE_{idx}')
-            y_pos = len(rules) - idx
-
-            # Condition node on left
-            pos[f"cond_{rule_id}"] = (-1, y_pos)
-
-            # Outcome node on right
-            pos[f"outcome_{rule_id}"] = (1, y_pos)
-
-        return pos
-
-    def _create_plotly_figure(self, G: nx.DiGraph, pos: Dict[str, Tuple[float, float]]) -> go.Figure:
-        """Create Plotly figure from graph and positions"""
-
-        # Extract edge coordinates
-        edge_x = []
-        edge_y = []
-        edge_text = []
+            node_text.append(condition_label)
+            node_color.append(self.COLORS['NODE'])
+            node_size.append(25)
+
+            # Outcome node
+            node_text.append(f"{decision}\nRisk: {risk_score}")
+            node_color.append(self.COLORS.get(decision, '#6B7280'))
+            node_size.append(30)
+
+        # Layout: START on top, rules stacked downwards with conditions left and outcomes right
+        y = n - np.arange(n, dtype=float)
+        node_x = np.empty(2 * n + 1)
+        node_y = np.empty(2 * n + 1)
+        node_x[0], node_y[0] = 0, n + 1
+        node_x[1::2], node_y[1::2] = -1, y
+        node_x[2::2], node_y[2::2] = 1, y
+
+        # Edges as (x0, x1, gap) triples: START -> every condition, then per rule
+        # condition -> outcome ("match") and condition -> next condition ("no match")
+        edge_x = np.full((max(3 * n - 1, 0), 3), np.nan)
+        edge_y = np.full((max(3 * n - 1, 0), 3), np.nan)
+        edge_x[:n, 0], edge_x[:n, 1] = 0, -1
+        edge_y[:n, 0], edge_y[:n, 1] = n + 1, y
+        match = n + 2 * np.arange(n)
+        edge_x[match, 0], edge_x[match, 1] = -1, 1
+        edge_y[match, 0], edge_y[match, 1] = y, y
+        no_match = match[:-1] + 1
+        edge_x[no_match, 0], edge_x[no_match, 1] = -1, -1
+        edge_y[no_match, 0], edge_y[no_match, 1] = y[:-1], y[1:]
+
+        return self._create_plotly_figure(
+            edge_x.ravel(), edge_y.ravel(), node_x, node_y, node_text, node_color, node_size
+        )
 
-        for edge in G.edges(data=True):
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+    def _create_plotly_figure(
+        self,
+        edge_x: np.ndarray,
+        edge_y: np.ndarray,
+        node_x: np.ndarray,
+        node_y: np.ndarray,
+        node_text: List[str],
+        node_color: List[str],
+        node_size: List[int]
+    ) -> go.Figure:
+        """Create Plotly figure from edge and node coordinates (NaN separates edges)"""
 
         # Create edge trace
         edge_trace = go.Scatter(
@@ -133,36 +121,6 @@ class RuleVisualizer:
             mode='lines'
         )
 
-        # Extract node coordinates and data
-        node_x = []
-        node_y = []
-        node_text = []
-        node_color = []
-        node_size = []
-
-        for node in G.nodes(data=True):
-            x, y = pos[node[0]]
-            node_x.append(x)
-            node_y.append(y)
-
-            label = node[1].get('label', node[0])
-            node_type = node[1].get('node_type', 'unknown')
-
-            if node_type == 'root':
-                node_text.append(label)
-                node_color.append('#6B7280')
-                node_size.append(30)
-            elif node_type == 'condition':
-                node_text.append(label)
-                node_color.append(self.COLORS['NODE'])
-                node_size.append(25)
-            elif node_type == 'outcome':
-                decision = node[1].get('decision', 'UNKNOWN')
-                risk_score = node[1].get('risk_score', 0)
-                node_text.append(f"{label}")
-                node_color.append(self.COLORS.get(decision, '#6B7280'))
-                node_size.append(30)
-
         # Create node trace
         node_trace = go.Scatter(
             x=node_x,
@@ -206,13 +164,18 @@ class RuleVisualizer:
             decision = rule.get('outcome', {}).get('decision', 'UNKNOWN')
             risk = rule.get('outcome', {}).get('risk_score', 0)
 
-            lines.append(f"┌{'─' * 40}┐")
+            lines.append(_TOP)
             lines.append(f"│ {rule_name:<38} │")
-            lines.append(f"└{'─' * 40}┘")
-            lines.append(f"    ↓ match")
+            lines.append(_BOT)
+            lines.append("    ↓ match")
             lines.append(f"  {decision} (Risk: {risk})")
 
             if idx < len(rules) - 1:
                 lines.append("    ↓ no match")
 
         return "\n".join(lines)
+
+@lru_cache(maxsize=8)
+def _cached_decision_tree(visualizer_cls: type, rules_key: bytes) -> go.Figure:
+    """Build the decision tree for rules serialized as sorted-key JSON"""
+    return visualizer_cls()._build_decision_tree(orjson.loads(rules_key))